@@ -613,7 +613,7 @@ class AtlasDescription(object):
         # Load the appropriate transformation matrix
         # and transform all those voxel coordinates
         # into world coordinates
-        coords = affine.transform(coords, self.xforms[0])
+        coords = affine.transformPoints(coords, self.xforms[0])
 
         # Update the coordinates
         # in our label objects
@@ -849,7 +849,7 @@ class LabelAtlas(Atlas):
         """
 
         if not voxel:
-            loc = affine.transform([loc], self.worldToVoxMat)[0]
+            loc = affine.transformPoints([loc], self.worldToVoxMat)[0]
             loc = [int(v) for v in loc.round()]
 
         if loc[0] <  0             or \
@@ -1033,7 +1033,7 @@ class StatisticAtlas(Atlas):
         """
 
         if not voxel:
-            loc = affine.transform([loc], self.worldToVoxMat)[0]
+            loc = affine.transformPoints([loc], self.worldToVoxMat)[0]
             loc = [int(v) for v in loc.round()]
 
         if loc[0] <  0             or \
@@ -466,9 +466,9 @@ def loadClusterResults(featdir, settings, contrast):
         zcog    = [c.zcogx,    c.zcogy,    c.zcogz]
         copemax = [c.copemaxx, c.copemaxy, c.copemaxz]
 
-        zmax    = affine.transform([zmax],    coordXform)[0].round()
-        zcog    = affine.transform([zcog],    coordXform)[0].round()
-        copemax = affine.transform([copemax], coordXform)[0].round()
+        zmax    = affine.transformPoints([zmax],    coordXform)[0].round()
+        zcog    = affine.transformPoints([zcog],    coordXform)[0].round()
+        copemax = affine.transformPoints([copemax], coordXform)[0].round()
 
         c.zmaxx,   c.zmaxy,    c.zmaxz    = zmax
         c.zcogx,   c.zcogy,    c.zcogz    = zcog
@@ -409,9 +409,9 @@ class Nifti(notifier.Notifier, meta.Meta):
         affines['voxel', 'voxel'] = np.eye(4)
         affines['world', 'world'] = np.eye(4)
         affines['voxel', 'world'] = voxToWorldMat
-        affines['world', 'voxel'] = affine.invert(voxToWorldMat)
+        affines['world', 'voxel'] = affine.invAffine(voxToWorldMat)
         affines['voxel', 'fsl']   = voxToScaledVoxMat
-        affines['fsl',   'voxel'] = affine.invert(voxToScaledVoxMat)
+        affines['fsl',   'voxel'] = affine.invAffine(voxToScaledVoxMat)
         affines['fsl',   'world'] = affine.concat(affines['voxel', 'world'],
                                                   affines['fsl',   'voxel'])
         affines['world', 'fsl']   = affine.concat(affines['voxel',   'fsl'],
@@ -11,8 +11,10 @@ transformations. The following functions are available:
    :nosignatures:
 
    transform
+   transformPoints
    scaleOffsetXform
    invert
+   invAffine
    concat
    compose
    decompose
@@ -20,6 +22,7 @@ transformations. The following functions are available:
    rotMatToAxisAngles
    axisAnglesToRotMat
    axisBounds
+   axisBoundsBatch
    rmsdev
    rescale
 
@@ -34,9 +37,10 @@ And a few more functions are provided for working with vectors:
 """
 
 
-import collections.abc as abc
-import numpy           as np
-import numpy.linalg    as linalg
+import                functools
+import                math
+import numpy        as np
+import numpy.linalg as linalg
 
 
 def invert(x):
@@ -44,6 +48,47 @@ def invert(x):
     return linalg.inv(x)
 
 
+def invAffine(x):
+    """Inverts the given ``(4, 4)`` affine transformation matrix.
+
+    The matrix is assumed to be of the form ``[[R, t], [0, 1]]``, i.e. to
+    have no perspective components. Its inverse is then given by
+    ``[[inv(R), -inv(R) t], [0, 1]]``, where ``inv(R)`` is calculated in
+    closed form from the cofactors and determinant of ``R``. For a single
+    affine this is cheaper than the general LAPACK inverse used by
+    :func:`invert`.
+
+    :returns: A ``numpy.float64`` array of size :math:`4 \\times 4`.
+    """
+
+    (a, b, c, tx), (d, e, f, ty), (g, h, i, tz) = np.asarray(x)[:3].tolist()
+
+    # cofactors of the first column
+    c00 = e * i - f * h
+    c10 = f * g - d * i
+    c20 = d * h - e * g
+    det = a * c00 + b * c10 + c * c20
+
+    if det == 0:
+        raise linalg.LinAlgError('Singular matrix')
+
+    det = 1.0 / det
+    r00 = c00 * det
+    r01 = (c * h - b * i) * det
+    r02 = (b * f - c * e) * det
+    r10 = c10 * det
+    r11 = (a * i - c * g) * det
+    r12 = (c * d - a * f) * det
+    r20 = c20 * det
+    r21 = (b * g - a * h) * det
+    r22 = (a * e - b * d) * det
+
+    return np.array([r00, r01, r02, -(r00 * tx + r01 * ty + r02 * tz),
+                     r10, r11, r12, -(r10 * tx + r11 * ty + r12 * tz),
+                     r20, r21, r22, -(r20 * tx + r21 * ty + r22 * tz),
+                     0.0, 0.0, 0.0,  1.0]).reshape(4, 4)
+
+
 def concat(*xforms):
     """Combines the given matrices (returns the dot product)."""
 
@@ -94,28 +139,15 @@ def scaleOffsetXform(scales, offsets):
     :returns:     A ``numpy.float32`` array of size :math:`4 \\times 4`.
     """
 
-    oktypes = (abc.Sequence, np.ndarray)
+    oktypes = (list, tuple, np.ndarray)
 
     if not isinstance(scales,  oktypes): scales  = [scales]
     if not isinstance(offsets, oktypes): offsets = [offsets]
-    if not isinstance(scales,  list):    scales  = list(scales)
-    if not isinstance(offsets, list):    offsets = list(offsets)
-
-    lens = len(scales)
-    leno = len(offsets)
-
-    if lens < 3: scales  = scales  + [1.0] * (3 - lens)
-    if leno < 3: offsets = offsets + [0.0] * (3 - leno)
 
     xform = np.eye(4, dtype=np.float64)
 
-    xform[0, 0] = scales[0]
-    xform[1, 1] = scales[1]
-    xform[2, 2] = scales[2]
-
-    xform[0, 3] = offsets[0]
-    xform[1, 3] = offsets[1]
-    xform[2, 3] = offsets[2]
+    for i, s in enumerate(scales[:3]):  xform[i, i] = s
+    for i, o in enumerate(offsets[:3]): xform[i, 3] = o
 
     return xform
 
@@ -137,42 +169,35 @@ def compose(scales, offsets, rotations, origin=None, shears=None):
     :arg shears:    Sequence of three shear values
     """
 
-    preRotate  = np.eye(4)
-    postRotate = np.eye(4)
-
     rotations = np.array(rotations)
 
     if rotations.shape == (3,):
         rotations = axisAnglesToRotMat(*rotations)
 
-    if origin is not None:
-        preRotate[ 0, 3] = -origin[0]
-        preRotate[ 1, 3] = -origin[1]
-        preRotate[ 2, 3] = -origin[2]
-        postRotate[0, 3] =  origin[0]
-        postRotate[1, 3] =  origin[1]
-        postRotate[2, 3] =  origin[2]
-
-    scale  = np.eye(4, dtype=np.float64)
-    offset = np.eye(4, dtype=np.float64)
-    rotate = np.eye(4, dtype=np.float64)
-    shear  = np.eye(4, dtype=np.float64)
-
-    scale[  0,  0] = scales[ 0]
-    scale[  1,  1] = scales[ 1]
-    scale[  2,  2] = scales[ 2]
-    offset[ 0,  3] = offsets[0]
-    offset[ 1,  3] = offsets[1]
-    offset[ 2,  3] = offsets[2]
-
-    rotate[:3, :3] = rotations
+    # The transformation is equivalent to:
+    #
+    #   offset * postRotate * rotate * preRotate * scale * shear
+    #
+    # where pre/postRotate are translations to/from the
+    # rotation origin. We construct it directly, rather
+    # than creating and multiplying each matrix.
+    xform = np.eye(4, dtype=np.float64)
+
+    xform[:3, :3] = rotations * np.asarray(scales[:3], dtype=np.float64)
+    xform[:3,  3] = offsets[:3]
 
     if shears is not None:
+        shear       = np.eye(3, dtype=np.float64)
         shear[0, 1] = shears[0]
         shear[0, 2] = shears[1]
         shear[1, 2] = shears[2]
+        xform[:3, :3] = np.dot(xform[:3, :3], shear)
 
-    return concat(offset, postRotate, rotate, preRotate, scale, shear)
+    if origin is not None:
+        origin         = np.asarray(origin[:3], dtype=np.float64)
+        xform[:3, 3] += origin - np.dot(rotations, origin)
+
+    return xform
 
 
 def decompose(xform, angles=True, shears=False):
@@ -209,10 +234,13 @@ def decompose(xform, angles=True, shears=False):
     # The next step is to extract the translations. This is trivial;
     # we find t_x = M_{4,1}, t_y = M_{4,2}, and t_z = M_{4,3}. At this
     # point we are left with a 3*3 matrix M' = M_{1..3,1..3}.
-    xform = np.array(xform).T
+    #
+    # [The input is not modified below, so we work on a view
+    #  of it, and only copy the translations, which are returned]
+    xform = np.asarray(xform).T
 
     if xform.shape == (4, 4):
-        translations = xform[ 3, :3]
+        translations = np.array(xform[3, :3])
         xform        = xform[:3, :3]
     else:
         translations = np.array([0, 0, 0])
@@ -223,7 +251,7 @@ def decompose(xform, angles=True, shears=False):
 
     # The process of finding the scaling factors and shear parameters
     # is interleaved. First, find s_x = |M'_1|.
-    sx = np.sqrt(np.dot(M1, M1))
+    sx = math.sqrt(np.dot(M1, M1))
     M1 = M1 / sx
 
     # Then, compute an initial value for the xy shear factor,
@@ -236,7 +264,7 @@ def decompose(xform, angles=True, shears=False):
 
     # Then the y scaling factor, s_y, is the length of the modified
     # second row.
-    sy = np.sqrt(np.dot(M2, M2))
+    sy = math.sqrt(np.dot(M2, M2))
 
     # The second row is normalized, and s_xy is divided by s_y to
     # get its final value.
@@ -251,7 +279,7 @@ def decompose(xform, angles=True, shears=False):
     M3 = M3 - sxz * M1 - syz * M2
 
     # the z scaling factor is computed,
-    sz = np.sqrt(np.dot(M3, M3))
+    sz = math.sqrt(np.dot(M3, M3))
 
     # the third row is normalized, and the xz and yz shear factors are
     # rescaled.
@@ -298,16 +326,16 @@ def rotMatToAxisAngles(rotmat):
     an angle in radians about each axis.
     """
 
-    yrot = np.sqrt(rotmat[0, 0] ** 2 + rotmat[1, 0] ** 2)
+    yrot = math.sqrt(rotmat[0, 0] ** 2 + rotmat[1, 0] ** 2)
 
-    if np.isclose(yrot, 0):
-        xrot = np.arctan2(-rotmat[1, 2], rotmat[1, 1])
-        yrot = np.arctan2(-rotmat[2, 0], yrot)
+    if math.isclose(yrot, 0, abs_tol=1e-8):
+        xrot = math.atan2(-rotmat[1, 2], rotmat[1, 1])
+        yrot = math.atan2(-rotmat[2, 0], yrot)
         zrot = 0
     else:
-        xrot = np.arctan2( rotmat[2, 1], rotmat[2, 2])
-        yrot = np.arctan2(-rotmat[2, 0], yrot)
-        zrot = np.arctan2( rotmat[1, 0], rotmat[0, 0])
+        xrot = math.atan2( rotmat[2, 1], rotmat[2, 2])
+        yrot = math.atan2(-rotmat[2, 0], yrot)
+        zrot = math.atan2( rotmat[1, 0], rotmat[0, 0])
 
     return [xrot, yrot, zrot]
 
@@ -316,27 +344,29 @@ def axisAnglesToRotMat(xrot, yrot, zrot):
     """Constructs a ``(3, 3)`` rotation matrix from the given angles, which
     must be specified in radians.
     """
+    return _axisAnglesToRotMat(float(xrot), float(yrot), float(zrot)).copy()
 
-    xmat = np.eye(3)
-    ymat = np.eye(3)
-    zmat = np.eye(3)
 
-    xmat[1, 1] =  np.cos(xrot)
-    xmat[1, 2] = -np.sin(xrot)
-    xmat[2, 1] =  np.sin(xrot)
-    xmat[2, 2] =  np.cos(xrot)
+@functools.lru_cache(maxsize=128)
+def _axisAnglesToRotMat(xrot, yrot, zrot):
+    """Used by :func:`axisAnglesToRotMat`. The result is cached, so must not
+    be modified.
+    """
 
-    ymat[0, 0] =  np.cos(yrot)
-    ymat[0, 2] =  np.sin(yrot)
-    ymat[2, 0] = -np.sin(yrot)
-    ymat[2, 2] =  np.cos(yrot)
+    sx, cx = math.sin(xrot), math.cos(xrot)
+    sy, cy = math.sin(yrot), math.cos(yrot)
+    sz, cz = math.sin(zrot), math.cos(zrot)
 
-    zmat[0, 0] =  np.cos(zrot)
-    zmat[0, 1] = -np.sin(zrot)
-    zmat[1, 0] =  np.sin(zrot)
-    zmat[1, 1] =  np.cos(zrot)
+    # Equivalent to concat(zmat, ymat, xmat),
+    # where each of zmat, ymat and xmat is a
+    # rotation about the corresponding axis.
+    rotmat = np.array([
+        [cz * cy, cz * sy * sx - sz * cx, cz * sy * cx + sz * sx],
+        [sz * cy, sz * sy * sx + cz * cx, sz * sy * cx - cz * sx],
+        [-sy,     cy * sx,                cy * cx]])
+    rotmat.flags.writeable = False
 
-    return concat(zmat, ymat, xmat)
+    return rotmat
 
 
 def axisBounds(shape,
@@ -404,6 +434,82 @@ def axisBounds(shape,
                    requested world coordinate system axis.
     """
 
+    scalar = axes is not None and np.ndim(axes) == 0
+
+    if axes is None: axes = [0, 1, 2]
+    elif scalar:     axes = [axes]
+
+    lo, hi = _boxLimits(np.array(shape[:3], dtype=np.float64),
+                        origin, boundary, offset)
+
+    # (8, 3) array containing the
+    # corners of the bounding box
+    points = np.where(_BOX_CORNERS, hi, lo).astype(np.float32)
+    xform  = np.asarray(xform)
+    tx     = np.dot(points, xform[:3, :3].T) + xform[:3, 3]
+    tx     = tx[:, axes]
+
+    lo = tx.min(axis=0)
+    hi = tx.max(axis=0)
+
+    if scalar: return (lo[0], hi[0])
+    else:      return (lo,    hi)
+
+
+def axisBoundsBatch(shapes,
+                    xforms,
+                    axes=None,
+                    origin='centre',
+                    boundary='high',
+                    offset=1e-4):
+    """Calculates the ``(lo, hi)`` bounds of the specified axes for a
+    collection of images in a single call. See :func:`axisBounds` for
+    details on the ``origin``, ``boundary`` and ``offset`` arguments.
+
+    :arg shapes:   Sequence of ``B`` image shapes. Only the first three
+                   dimensions of each shape are used.
+
+    :arg xforms:   Sequence of ``B`` ``(4, 4)`` transformation matrices,
+                   or an array of shape ``(B, 4, 4)``.
+
+    :arg axes:     Sequence of world coordinate system axes to calculate
+                   bounds for. Defaults to ``[0, 1, 2]``.
+
+    :returns:      A tuple containing the ``(low, high)`` bounds, each an
+                   array of shape ``(B, len(axes))``.
+    """
+
+    if axes is None:
+        axes = [0, 1, 2]
+
+    xforms = np.asarray(xforms).reshape(-1, 4, 4)
+    hi     = np.array([s[:3] for s in shapes], dtype=np.float64).reshape(-1, 3)
+    lo, hi = _boxLimits(hi, origin, boundary, offset)
+
+    # (B, 8, 3) array containing the
+    # corners of each bounding box
+    points = np.where(_BOX_CORNERS, hi[:, None, :], lo)
+    points = points.astype(np.float32)
+
+    tx = np.einsum('bij,bkj->bki', xforms[:, :3, :3], points)
+    tx = tx + xforms[:, None, :3, 3]
+    tx = tx[:, :, axes]
+
+    return tx.min(axis=1), tx.max(axis=1)
+
+
+def _boxLimits(shape, origin, boundary, offset):
+    """Used by :func:`axisBounds` and :func:`axisBoundsBatch`. Validates the
+    ``origin`` and ``boundary`` arguments, and calculates the low and high
+    voxel coordinates of the bounding box for the given ``shape``.
+
+    :arg shape: ``numpy`` array containing the shape(s) along the last axis.
+                Modified in place.
+    :returns:   A tuple containing the low voxel coordinate, as a scalar
+                which is the same for all axes, and the high voxel
+                coordinates, as an array of the same shape as ``shape``.
+    """
+
     origin = origin.lower()
 
     # lousy US spelling
@@ -415,62 +521,56 @@ def axisBounds(shape,
     if boundary not in ('low', 'high', 'both', None):
         raise ValueError('Invalid boundary value: {}'.format(boundary))
 
-    scalar = False
-
-    if axes is None:
-        axes = [0, 1, 2]
-
-    elif not isinstance(axes, abc.Iterable):
-        scalar = True
-        axes   = [axes]
-
-    x, y, z = shape[:3]
-
-    points = np.zeros((8, 3), dtype=np.float32)
+    lo = 0.0
+    hi = shape
 
     if origin == 'centre':
-        x0 = -0.5
-        y0 = -0.5
-        z0 = -0.5
-        x -=  0.5
-        y -=  0.5
-        z -=  0.5
-    else:
-        x0 = 0
-        y0 = 0
-        z0 = 0
+        lo -= 0.5
+        hi -= 0.5
 
     if boundary in ('low', 'both'):
-        x0 += offset
-        y0 += offset
-        z0 += offset
+        lo += offset
 
     if boundary in ('high', 'both'):
-        x  -= offset
-        y  -= offset
-        z  -= offset
+        hi -= offset
+
+    return lo, hi
+
+
+_BOX_CORNERS = np.array([[0, 0, 0],
+                         [0, 0, 1],
+                         [0, 1, 0],
+                         [0, 1, 1],
+                         [1, 0, 0],
+                         [1, 0, 1],
+                         [1, 1, 0],
+                         [1, 1, 1]], dtype=bool)
+"""Used by :func:`axisBounds` and :func:`axisBoundsBatch`. Identifies the
+low (``False``) or high (``True``) value on each axis for the eight corners
+of a bounding box.
+"""
 
-    points[0, :] = [x0, y0, z0]
-    points[1, :] = [x0, y0,  z]
-    points[2, :] = [x0,  y, z0]
-    points[3, :] = [x0,  y,  z]
-    points[4, :] = [x,  y0, z0]
-    points[5, :] = [x,  y0,  z]
-    points[6, :] = [x,   y, z0]
-    points[7, :] = [x,   y,  z]
 
-    tx = transform(points, xform)
+def transform(p, xform, axes=None, vector=False):
+    """Transforms the given set of points ``p`` according to the given affine
+    transformation ``xform``. See :func:`transformPoints` for details on the
+    arguments.
 
-    lo = tx[:, axes].min(axis=0)
-    hi = tx[:, axes].max(axis=0)
+    :returns: The points in ``p``, transformed by ``xform``, as a ``numpy``
+              array with the same data type as the input. If the result
+              contains a single value, that value is returned instead.
+    """
 
-    if scalar: return (lo[0], hi[0])
-    else:      return (lo,    hi)
+    t = transformPoints(p, xform, axes, vector)
 
+    if t.size == 1: return t[0]
+    else:           return t
 
-def transform(p, xform, axes=None, vector=False):
+
+def transformPoints(p, xform, axes=None, vector=False):
     """Transforms the given set of points ``p`` according to the given affine
-    transformation ``xform``.
+    transformation ``xform``. Unlike :func:`transform`, this function
+    always returns an array.
 
 
     :arg p:      A sequence or array of points of shape :math:`N \\times  3`.
@@ -502,17 +602,19 @@ def transform(p, xform, axes=None, vector=False):
               scalings.
     """
 
-    p  = _fillPoints(p, axes)
-    t  = np.dot(xform[:3, :3], p.T).T
+    p = _fillPoints(p, axes)
+
+    # A contiguous copy of the rotation/scaling
+    # component can be passed straight to BLAS
+    t = np.dot(p, np.ascontiguousarray(xform[:3, :3]).T)
 
     if not vector:
-        t = t + xform[:3, 3]
+        t += xform[:3, 3]
 
     if axes is not None:
         t = t[:, axes]
 
-    if t.size == 1: return t[0]
-    else:           return t
+    return t
 
 
 def transformNormal(p, xform, axes=None):
@@ -524,18 +626,16 @@ def transformNormal(p, xform, axes=None):
 
 
 def _fillPoints(p, axes):
-    """Used by the :func:`transform` function. Turns the given array p into
-    a ``N*3`` array of ``x,y,z`` coordinates. The array p may be a 1D array,
-    or an ``N*2`` or ``N*3`` array.
+    """Used by the :func:`transformPoints` function. Turns the given array p
+    into a ``N*3`` array of ``x,y,z`` coordinates. The array p may be a 1D
+    array, or an ``N*2`` or ``N*3`` array.
     """
 
-    if not isinstance(p, abc.Iterable): p = [p]
-
-    p = np.array(p)
+    p = np.atleast_1d(p)
 
     if axes is None: return p
 
-    if not isinstance(axes, abc.Iterable): axes = [axes]
+    if np.ndim(axes) == 0: axes = [axes]
 
     if p.ndim == 1:
         p = p.reshape((len(p), 1))
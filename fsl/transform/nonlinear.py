@@ -261,7 +261,7 @@ class DeformationField(NonLinearTransform):
         # displacements
         if from_ != self.refSpace:
             xform  = self.ref.getAffine(from_, self.refSpace)
-            coords = affine.transform(coords, xform)
+            coords = affine.transformPoints(coords, xform)
 
         # We also need to get the coordinates
         # in field voxels, so we can look up
@@ -275,7 +275,7 @@ class DeformationField(NonLinearTransform):
         if np.all(np.isclose(xform, np.eye(4))):
             voxels = coords
         else:
-            voxels = affine.transform(coords, xform)
+            voxels = affine.transformPoints(coords, xform)
 
         # Mask out the coordinates
         # that are out of bounds of
@@ -294,7 +294,7 @@ class DeformationField(NonLinearTransform):
         # the requested source image space
         if to != self.srcSpace:
             xform = self.src.getAffine(self.srcSpace, to)
-            disps = affine.transform(disps, xform)
+            disps = affine.transformPoints(disps, xform)
 
         # Nans for input coordinates which
         # were outside of the field
@@ -376,10 +376,10 @@ class CoefficientField(NonLinearTransform):
         self.__refToSrcMat   = None
         self.__srcToRefMat   = srcToRefMat
         self.__fieldToRefMat = np.copy(fieldToRefMat)
-        self.__refToFieldMat = affine.invert(self.__fieldToRefMat)
+        self.__refToFieldMat = affine.invAffine(self.__fieldToRefMat)
 
         if srcToRefMat is not None:
-            self.__refToSrcMat = affine.invert(srcToRefMat)
+            self.__refToSrcMat = affine.invAffine(srcToRefMat)
 
 
     @property
@@ -500,7 +500,7 @@ class CoefficientField(NonLinearTransform):
         # Convert the given voxel coordinates
         # into the corresponding coefficient
         # field voxel coordinates
-        i, j, k = affine.transform(coords, self.refToFieldMat).T
+        i, j, k = affine.transformPoints(coords, self.refToFieldMat).T
 
         # i, j, k: coefficient field indices
         # u, v, w: position of the ref voxel
@@ -595,7 +595,7 @@ def convertDeformationType(field, defType=None):
                              np.arange(dy),
                              np.arange(dz), indexing='ij')
     coords     = np.array(coords).transpose((1, 2, 3, 0))
-    coords     = affine.transform(coords.reshape((-1, 3)), xform)
+    coords     = affine.transformPoints(coords.reshape((-1, 3)), xform)
     coords     = coords.reshape((dx, dy, dz, 3))
 
     # If converting from relative to absolute,
@@ -639,7 +639,7 @@ def convertDeformationSpace(field, from_, to):
     if to != field.srcSpace:
 
         srcmat    = field.src.getAffine(field.srcSpace, to)
-        srccoords = affine.transform(srccoords, srcmat)
+        srccoords = affine.transformPoints(srccoords, srcmat)
 
     # If we have been asked to return
     # absolute coordinates, the
@@ -669,7 +669,7 @@ def convertDeformationSpace(field, from_, to):
             field    .getAffine('voxel', 'world'))
 
         if not np.all(np.isclose(xform, np.eye(4))):
-            refcoords = affine.transform(refcoords, xform)
+            refcoords = affine.transformPoints(refcoords, xform)
 
         fieldcoords = srccoords - refcoords
 
@@ -786,7 +786,7 @@ def applyDeformation(image,
             premat = affine.invert(premat)
         shape = field.shape
         field = field.reshape((-1, 3))
-        field = affine.transform(field, premat)
+        field = affine.transformPoints(field, premat)
         field = field.reshape(shape)
 
     field = field.transpose((3, 0, 1, 2))
@@ -872,7 +872,7 @@ def coefficientFieldToDeformationField(field, defType='relative', premat=True):
         disps  = disps.reshape(-1, 3)
         premat = affine.concat(field.refToSrcMat - np.eye(4),
                                field.ref.getAffine('voxel', 'fsl'))
-        disps  = disps + affine.transform(xyz, premat)
+        disps  = disps + affine.transformPoints(xyz, premat)
         disps  = disps.reshape(shape)
 
         # note that convertwarp applies a premat
@@ -880,7 +880,7 @@ def coefficientFieldToDeformationField(field, defType='relative', premat=True):
         # to directly transforming the existing
         # absolute displacements, i.e.:
         #
-        #   disps = affine.transform(disps, refToSrc)
+        #   disps = affine.transformPoints(disps, refToSrc)
 
     adfield = DeformationField(disps,
                                header=field.ref.header,
@@ -391,6 +391,28 @@ def namedPositionals(func, args):
     :arg args: Tuple of positional arguments to be passed to ``func``.
     """
 
+    # The argument names only depend on the
+    # function signature and the number of
+    # positional arguments, so are cached to
+    # avoid re-inspecting func on every call.
+    # Unhashable callables cannot be cached.
+    try:
+        argnames = _cachedNamedPositionals(func, len(args))
+    except TypeError:
+        argnames = _namedPositionals(func, len(args))
+
+    return list(argnames)
+
+
+def _namedPositionals(func, nargs):
+    """Used by :func:`namedPositionals`. Identifies the name for each of
+    ``nargs`` positional arguments to ``func``.
+
+    :arg func:  Function which will accept ``nargs`` positionals.
+    :arg nargs: Number of positional arguments to be passed to ``func``.
+    :returns:   A tuple containing the argument names.
+    """
+
     # Current implementation will
     # result in naming collisions
     # for something like this:
@@ -427,14 +449,20 @@ def namedPositionals(func, args):
 
     # we only care about the arguments
     # that are being passed in
-    argnames = argnames[:len(args)]
+    argnames = list(argnames[:nargs])
 
     # make up names for varargs
-    nvarargs = len(args) - len(argnames)
+    nvarargs = nargs - len(argnames)
     if varargs is not None and nvarargs > 0:
         argnames += ['{}{}'.format(varargs, i) for i in range(nvarargs)]
 
-    return argnames
+    return tuple(argnames)
+
+
+_cachedNamedPositionals = functools.lru_cache(maxsize=256)(_namedPositionals)
+"""Cached version of :func:`_namedPositionals`, used by
+:func:`namedPositionals`.
+"""
 
 
 LOAD = object()
@@ -7,9 +7,14 @@
 
 import pytest
 
+import io
+import os
 import os.path as op
 import random
+import shutil
+import tempfile
 import numpy as np
+import nibabel as nib
 
 
 
@@ -47,3 +52,35 @@ def seed(request):
     random   .seed(seed)
     print('Seed for random number generator: {}'.format(seed))
     return seed
+
+
+@pytest.fixture
+def fasttmp(tmp_path_factory):
+    """Temporary directory for a single test. On platforms which have a
+    RAM-backed ``/dev/shm`` (e.g. Linux), the directory is created there,
+    to avoid disk I/O. Otherwise a regular pytest temporary directory is
+    used.
+    """
+
+    shm = op.join(os.sep, 'dev', 'shm')
+
+    if not (op.isdir(shm) and os.access(shm, os.W_OK)):
+        yield str(tmp_path_factory.mktemp('fasttmp'))
+        return
+
+    testdir = tempfile.mkdtemp(prefix='fslpy-', dir=shm)
+    try:
+        yield testdir
+    finally:
+        shutil.rmtree(testdir)
+
+
+@pytest.fixture(scope='session', autouse=True)
+def warmup():
+    """Exercises the numpy text loader and the nibabel NIfTI writer once at
+    the start of the test session, so that their one-off initialisation
+    costs are not attributed to whichever test happens to use them first.
+    """
+    np.loadtxt(io.StringIO('1 2\n'))
+    img = nib.Nifti1Image(np.zeros((1, 1, 1)), np.eye(4))
+    img.to_file_map({'image' : nib.FileHolder(fileobj=io.BytesIO())})
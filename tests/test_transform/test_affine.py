@@ -61,6 +61,37 @@ def test_invert():
         assert np.all(np.isclose(invx, result))
 
 
+def test_invAffine(seed):
+
+    testfile = op.join(datadir, 'test_transform_test_invert.txt')
+    testdata = np.loadtxt(testfile)
+
+    nmatrices = testdata.shape[0] // 4
+
+    for i in range(nmatrices):
+
+        x = testdata[i * 4:i * 4 + 4, 0:4]
+
+        # only test affines
+        if not np.all(np.isclose(x[3], [0, 0, 0, 1])):
+            continue
+
+        assert np.all(np.isclose(affine.invAffine(x), npla.inv(x)))
+
+    for i in range(50):
+        scales    = -5    + 10     * np.random.random(3)
+        offsets   = -50   + 100    * np.random.random(3)
+        rotations = -np.pi + 2 * np.pi * np.random.random(3)
+        xform     = affine.compose(scales, offsets, rotations)
+
+        assert np.all(np.isclose(affine.invAffine(xform), npla.inv(xform)))
+        assert np.all(np.isclose(affine.concat(xform, affine.invAffine(xform)),
+                                 np.eye(4)))
+
+    with pytest.raises(npla.LinAlgError):
+        affine.invAffine(np.diag([1, 0, 1, 1]))
+
+
 def test_concat():
 
     testfile = op.join(datadir, 'test_transform_test_concat.txt')
@@ -90,6 +121,17 @@ def test_concat():
 
         assert np.all(np.isclose(result, expected))
 
+    # non-square trailing inputs
+    xform = affine.scaleOffsetXform([2, 3, 4], [1, 2, 3])
+    eye   = np.eye(4)
+    pts   = np.random.random((4, 10))
+    vec   = [1, 2, 3, 1]
+
+    assert np.all(np.isclose(affine.concat(eye, xform, vec),
+                             np.dot(xform, vec)))
+    assert np.all(np.isclose(affine.concat(eye, eye, xform, pts),
+                             np.dot(xform, pts)))
+
 
 def test_veclength(seed):
 
@@ -300,6 +342,25 @@ def test_rotMatToAxisAngles(seed):
         assert np.all(np.isclose(rots, gotrots))
 
 
+def test_axisAnglesToRotMat_not_shared():
+
+    # axisAnglesToRotMat results are cached -
+    # make sure that callers get their own copy
+    rots = [0.1, 0.2, 0.3]
+    exp  = affine.axisAnglesToRotMat(*rots).copy()
+
+    rmat    = affine.axisAnglesToRotMat(*rots)
+    rmat[:] = 0
+    assert np.all(np.isclose(affine.axisAnglesToRotMat(*rots), exp))
+
+    exp        = affine.compose([1, 2, 3], [4, 5, 6], rots)
+    xform      = affine.compose([1, 2, 3], [4, 5, 6], rots)
+    xform[:3] *= 2
+    assert np.all(np.isclose(affine.compose([1, 2, 3], [4, 5, 6], rots), exp))
+    assert np.all(np.isclose(affine.axisAnglesToRotMat(*rots), exp[:3, :3] /
+                             [1, 2, 3]))
+
+
 def test_rotMatToAffine(seed):
 
     pi  = np.pi
@@ -385,6 +446,69 @@ def test_axisBounds():
         affine.axisBounds(shape, xform, origin=origin, boundary='Blufu')
 
 
+def test_axisBoundsBatch(seed):
+
+    shapes = np.random.randint(1, 100, (20, 3))
+    xforms = [affine.compose(-5     + 10         * np.random.random(3),
+                             -50    + 100        * np.random.random(3),
+                             -np.pi + 2  * np.pi * np.random.random(3))
+              for i in range(20)]
+
+    for origin, boundary in it.product(('centre', 'corner'),
+                                       ('low', 'high', 'both', None)):
+        for axes in (None, [0], [2, 0], (0, 1, 2)):
+
+            lo, hi = affine.axisBoundsBatch(shapes,
+                                            xforms,
+                                            axes=axes,
+                                            origin=origin,
+                                            boundary=boundary)
+
+            for shape, xform, blo, bhi in zip(shapes, xforms, lo, hi):
+                explo, exphi = affine.axisBounds(shape,
+                                                 xform,
+                                                 axes=axes,
+                                                 origin=origin,
+                                                 boundary=boundary)
+                assert np.all(np.isclose(blo, explo))
+                assert np.all(np.isclose(bhi, exphi))
+
+    # compare against bounds calculated by hand
+    shapes  = [(10, 20, 30), (10, 20, 30), (5, 6, 7)]
+    xforms  = [np.eye(4),
+               affine.scaleOffsetXform([ 2, 3, 4], [10, 20, 30]),
+               affine.scaleOffsetXform([-2, 1, 1], [ 0,  0,  0])]
+    cornerlo = [[  0,  0,  0], [10, 20,  30], [-10, 0, 0]]
+    cornerhi = [[ 10, 20, 30], [30, 80, 150], [  0, 6, 7]]
+    centrelo = [[-0.5, -0.5, -0.5], [ 9, 18.5,  28], [-9, -0.5, -0.5]]
+    centrehi = [[ 9.5, 19.5, 29.5], [29, 78.5, 148], [ 1,  5.5,  6.5]]
+
+    lo, hi = affine.axisBoundsBatch(shapes, xforms,
+                                    origin='corner', boundary=None)
+    assert np.all(np.isclose(lo, cornerlo))
+    assert np.all(np.isclose(hi, cornerhi))
+
+    lo, hi = affine.axisBoundsBatch(shapes, xforms, boundary=None)
+    assert np.all(np.isclose(lo, centrelo))
+    assert np.all(np.isclose(hi, centrehi))
+
+    for shape, xform, explo, exphi in zip(shapes, xforms, centrelo, centrehi):
+        lo, hi = affine.axisBounds(shape, xform, boundary=None)
+        assert np.all(np.isclose(lo, explo))
+        assert np.all(np.isclose(hi, exphi))
+        lo, hi = affine.axisBounds(shape, xform, axes=1, boundary=None)
+        assert np.isclose(lo, explo[1])
+        assert np.isclose(hi, exphi[1])
+
+    # empty batch
+    lo, hi = affine.axisBoundsBatch([], [])
+    assert lo.shape == (0, 3)
+    assert hi.shape == (0, 3)
+    lo, hi = affine.axisBoundsBatch([], [], axes=[1])
+    assert lo.shape == (0, 1)
+    assert hi.shape == (0, 1)
+
+
 def test_transform():
 
     def is_orthogonal(xform):
@@ -452,6 +576,24 @@ def test_transform():
         affine.transform(badcoords[:, (1, 2, 3)], xform, axes=[1, 2])
 
 
+def test_transformPoints():
+
+    xform = affine.scaleOffsetXform([2, 3, 4], [1, 1, 1])
+
+    # transform returns a scalar for single-valued
+    # results, but transformPoints always returns
+    # an array
+    assert np.isclose(affine.transform(1, xform, axes=0), 3)
+
+    result = affine.transformPoints(1, xform, axes=0)
+    assert isinstance(result, np.ndarray)
+    assert result.shape == (1,)
+    assert np.isclose(result[0], 3)
+
+    result = affine.transformPoints([[1, 1, 1], [2, 2, 2]], xform)
+    assert np.all(np.isclose(result, [[3, 4, 5], [5, 7, 9]]))
+
+
 def test_transform_vector(seed):
 
     # Some transform with a
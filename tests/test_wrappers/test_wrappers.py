@@ -7,22 +7,24 @@
 
 import              os
 import os.path   as op
-import itertools as it
 import textwrap  as tw
 
 import numpy as np
 
+import pytest
+
 import fsl.wrappers                       as fw
 import fsl.utils.assertions               as asrt
 import fsl.utils.run                      as run
 from fsl.utils.tempdir import tempdir
+from fsl.utils.platform import platform as fslplatform
 
-from .. import mockFSLDIR, make_random_image
+from .. import mockFSLDIR, make_random_image, touch
 
 
 def checkResult(cmd, base, args, stripdir=None):
     """We can't control the order in which command line args are generated,
-    so we need to test all possible orderings.
+    so we need to accept any ordering of ``args`` after ``base``.
 
     :arg cmd:      Generated command
     :arg base:     Beginning of expected command
@@ -37,215 +39,161 @@ def checkResult(cmd, base, args, stripdir=None):
             cmd[si] = op.basename(cmd[si])
         cmd = ' '.join(cmd)
 
-    permutations = it.permutations(args, len(args))
-    possible     = [' '.join([base] + list(p))  for p in permutations]
+    if cmd != base and not cmd.startswith(base + ' '):
+        return False
 
-    return any([cmd == p for p in possible])
+    # Walk through the remaining tokens, and
+    # at each position consume an expected
+    # argument which matches - the longest
+    # first, so that e.g. "-m" cannot consume
+    # the start of "-m mask".
+    tokens   = cmd[len(base):].split()
+    expected = sorted([tuple(a.split()) for a in args], key=len, reverse=True)
+    i        = 0
 
+    while i < len(tokens):
+        for arg in expected:
+            if tuple(tokens[i:i + len(arg)]) == arg:
+                expected.remove(arg)
+                i += len(arg)
+                break
+        else:
+            return False
 
-def test_bet():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('bet',)) as fsldir:
-        bet      = op.join(fsldir, 'bin', 'bet')
-        result   = fw.bet('input', 'output', mask=True, c=(10, 20, 30))
-        expected = (bet + ' input output', ('-m', '-c 10 20 30'))
-        assert checkResult(result.stdout[0], *expected, stripdir=[2])
-
+    return len(expected) == 0
 
-def test_robustfov():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('robustfov',)) as fsldir:
-        rfov     = op.join(fsldir, 'bin', 'robustfov')
-        result   = fw.robustfov('input', 'output', b=180)
-        expected = (rfov + ' -i input', ('-r output', '-b 180'))
-        assert checkResult(result.stdout[0], *expected)
-
-
-def test_eddy_cuda():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('eddy_cuda',)) as fsldir:
-        eddy     = op.join(fsldir, 'bin', 'eddy_cuda')
-        result   = fw.eddy_cuda('imain', 'mask', 'index', 'acqp',
-                                'bvecs', 'bvals', 'out', dont_mask_output=True)
-        expected = (eddy, ('--imain=imain',
-                           '--mask=mask',
-                           '--index=index',
-                           '--acqp=acqp',
-                           '--bvecs=bvecs',
-                           '--bvals=bvals',
-                           '--out=out',
-                           '--dont_mask_output'))
-
-        assert checkResult(result.stdout[0], *expected)
-
-
-def test_topup():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('topup',)) as fsldir:
-        topup    = op.join(fsldir, 'bin', 'topup')
-        result   = fw.topup('imain', 'datain', minmet=1)
-        expected = topup + ' --imain=imain --datain=datain --minmet=1'
-        assert result.stdout[0] == expected
 
-
-def test_flirt():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('flirt',)) as fsldir:
-        flirt    = op.join(fsldir, 'bin', 'flirt')
-        result   = fw.flirt('src', 'ref', usesqform=True, anglerep='euler')
-        expected = (flirt + ' -in src -ref ref',
-                    ('-usesqform', '-anglerep euler'))
-        assert checkResult(result.stdout[0], *expected)
-
-
-def test_applyxfm():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('flirt',)) as fsldir:
-        flirt    = op.join(fsldir, 'bin', 'flirt')
-        result   = fw.applyxfm('src', 'ref', 'mat', 'out', interp='trilinear')
-        expected = (flirt + ' -in src -ref ref',
-                    ('-applyxfm',
-                     '-out out',
-                     '-init mat',
-                     '-interp trilinear'))
-        assert checkResult(result.stdout[0], *expected)
-
-
-def test_applyxfm4D():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('applyxfm4D',)) as fsldir:
-        applyxfm = op.join(fsldir, 'bin', 'applyxfm4D')
-        result   = fw.applyxfm4D(
-            'src', 'ref', 'out', 'mat', fourdigit=True, userprefix='boo')
-        expected = (applyxfm + ' src ref out mat',
-                    ('-fourdigit',
-                     '-userprefix boo'))
-        assert checkResult(result.stdout[0], *expected)
-
-
-def test_invxfm():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('convert_xfm',)) as fsldir:
-        cnvxfm   = op.join(fsldir, 'bin', 'convert_xfm')
-        result   = fw.invxfm('mat', 'output')
-        expected = cnvxfm + ' -omat output -inverse mat'
-        assert result.stdout[0] == expected
+# (wrapper function, positional args, keyword args,
+#  start of expected command, remaining expected args)
+#
+# The expected command is relative to $FSLDIR/bin/.
+WRAPPER_TESTS = [
+    (fw.robustfov, ('input', 'output'), {'b' : 180},
+     'robustfov -i input', ('-r output', '-b 180')),
+    (fw.eddy_cuda,
+     ('imain', 'mask', 'index', 'acqp', 'bvecs', 'bvals', 'out'),
+     {'dont_mask_output' : True},
+     'eddy_cuda', ('--imain=imain',
+                   '--mask=mask',
+                   '--index=index',
+                   '--acqp=acqp',
+                   '--bvecs=bvecs',
+                   '--bvals=bvals',
+                   '--out=out',
+                   '--dont_mask_output')),
+    (fw.topup, ('imain', 'datain'), {'minmet' : 1},
+     'topup --imain=imain --datain=datain --minmet=1', ()),
+    (fw.flirt, ('src', 'ref'), {'usesqform' : True, 'anglerep' : 'euler'},
+     'flirt -in src -ref ref', ('-usesqform', '-anglerep euler')),
+    (fw.applyxfm, ('src', 'ref', 'mat', 'out'), {'interp' : 'trilinear'},
+     'flirt -in src -ref ref', ('-applyxfm',
+                                '-out out',
+                                '-init mat',
+                                '-interp trilinear')),
+    (fw.applyxfm4D, ('src', 'ref', 'out', 'mat'),
+     {'fourdigit' : True, 'userprefix' : 'boo'},
+     'applyxfm4D src ref out mat', ('-fourdigit', '-userprefix boo')),
+    (fw.invxfm, ('mat', 'output'), {},
+     'convert_xfm -omat output -inverse mat', ()),
+    (fw.concatxfm, ('mat1', 'mat2', 'output'), {},
+     'convert_xfm -omat output -concat mat2 mat1', ()),
+    (fw.mcflirt, ('input',), {'out' : 'output', 'cost' : 'normcorr', 'dof' : 12},
+     'mcflirt -in input', ('-out output', '-cost normcorr', '-dof 12')),
+    (fw.fnirt, ('src',),
+     {'ref' : 'ref', 'iout' : 'iout', 'fout' : 'fout', 'subsamp' : (8, 6, 4, 2)},
+     'fnirt --in=src', ('--ref=ref',
+                        '--iout=iout',
+                        '--fout=fout',
+                        '--subsamp=8,6,4,2')),
+    (fw.applywarp, ('src', 'ref', 'out'),
+     {'warp' : 'warp', 'abs' : True, 'super' : True},
+     'applywarp --in=src --ref=ref --out=out',
+     ('--warp=warp', '--abs', '--super')),
+    (fw.invwarp, ('warp', 'ref', 'out'), {'rel' : True, 'noconstraint' : True},
+     'invwarp --warp=warp --ref=ref --out=out', ('--rel', '--noconstraint')),
+    (fw.convertwarp, ('out', 'ref'), {'absout' : True, 'jacobian' : 'jacobian'},
+     'convertwarp --ref=ref --out=out', ('--absout', '--jacobian=jacobian')),
+    (fw.fugue, (),
+     {'input' : 'input', 'warp' : 'warp', 'median' : True, 'dwell' : 10},
+     'fugue', ('--in=input', '--warp=warp', '--median', '--dwell=10')),
+    (fw.sigloss, ('input', 'sigloss'), {'mask' : 'mask', 'te' : 0.5},
+     'sigloss --in input --sigloss sigloss', ('--mask mask', '--te 0.5')),
+    (fw.prelude, (),
+     {'complex' : 'complex', 'out' : 'out', 'labelslices' : True, 'start' : 5},
+     'prelude', ('--complex=complex',
+                 '--out=out',
+                 '--labelslices',
+                 '--start=5')),
+    (fw.melodic, ('input',), {'dim' : 50, 'mask' : 'mask', 'Oall' : True},
+     'melodic --in=input', ('--dim=50', '--mask=mask', '--Oall')),
+    (fw.fsl_regfilt, ('input', 'output', 'design'),
+     {'filter' : (1, 2, 3, 4), 'vn' : True},
+     'fsl_regfilt --in=input --out=output --design=design',
+     ('--filter=1,2,3,4', '--vn')),
+    (fw.fslreorient2std, ('input', 'output'), {},
+     'fslreorient2std input output', ()),
+    (fw.slicer, ('input1', 'input2'), {'i' : (20, 100), 'x' : (20, 'x.png')},
+     'slicer input1 input2 -i 20 100 -x 20 x.png', ()),
+    (fw.cluster, ('input', 'thresh'), {'fractional' : True, 'osize' : 'osize'},
+     'cluster --in=input --thresh=thresh', ('--fractional', '--osize=osize')),
+    (fw.gps, ('bvecs', 128), {'optws' : True, 'ranseed' : 123},
+     'gps --ndir=128 --out=bvecs', ('--optws', '--ranseed=123')),
+    (fw.fsl_prepare_fieldmap, (),
+     {'phase_image'     : 'ph',
+      'magnitude_image' : 'mag',
+      'out_image'       : 'out',
+      'deltaTE'         : 2.46,
+      'nocheck'         : True},
+     'fsl_prepare_fieldmap',
+     ('SIEMENS', 'ph', 'mag', 'out', '2.46', '--nocheck')),
+]
+
+
+@pytest.fixture(scope='module')
+def mockfsldir(tmp_path_factory):
+    """Creates a mock $FSLDIR containing all of the executables used in this
+    module, once for the whole module. Unlike :func:`.mockFSLDIR`, this does
+    not change directory or activate the mock $FSLDIR - see :func:`fsldir`.
+    """
+    fsldir = str(tmp_path_factory.mktemp('fsl'))
+    bindir = op.join(fsldir, 'bin')
+    exes   = set([t[3].split()[0] for t in WRAPPER_TESTS] + ['bet'])
+    os.makedirs(bindir)
+    for exe in exes:
+        exe = op.join(bindir, exe)
+        touch(exe)
+        os.chmod(exe, 0o755)
+    return fsldir
+
+
+@pytest.fixture
+def fsldir(mockfsldir, monkeypatch):
+    """Activates the shared mock $FSLDIR for the duration of a single test,
+    in the same way as :func:`.mockFSLDIR`.
+    """
+    bindir = op.join(mockfsldir, 'bin')
+    path   = op.pathsep.join((bindir, os.environ['PATH']))
+    monkeypatch.setattr(fslplatform, 'fsldir',    mockfsldir)
+    monkeypatch.setattr(fslplatform, 'fsldevdir', None)
+    monkeypatch.setenv('PATH', path)
+    return mockfsldir
 
 
-def test_concatxfm():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('convert_xfm',)) as fsldir:
-        cnvxfm   = op.join(fsldir, 'bin', 'convert_xfm')
-        result   = fw.concatxfm('mat1', 'mat2', 'output')
-        expected = cnvxfm + ' -omat output -concat mat2 mat1'
-        assert result.stdout[0] == expected
+@pytest.mark.parametrize('func,args,kwargs,base,expargs', WRAPPER_TESTS,
+                         ids=[t[0].__name__ for t in WRAPPER_TESTS])
+def test_wrapper(fsldir, func, args, kwargs, base, expargs):
+    with asrt.disabled(), run.dryrun():
+        result = func(*args, **kwargs)
+    base = op.join(fsldir, 'bin', base)
+    assert checkResult(result.stdout[0], base, expargs)
 
 
-def test_mcflirt():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('mcflirt',)) as fsldir:
-        mcflirt  = op.join(fsldir, 'bin', 'mcflirt')
-        result   = fw.mcflirt('input', out='output', cost='normcorr', dof=12)
-        expected = (mcflirt + ' -in input',
-                    ('-out output',
-                     '-cost normcorr',
-                     '-dof 12'))
-        assert checkResult(result.stdout[0], *expected)
-
-
-def test_fnirt():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('fnirt',)) as fsldir:
-        fnirt    = op.join(fsldir, 'bin', 'fnirt')
-        result   = fw.fnirt('src', ref='ref', iout='iout', fout='fout',
-                            subsamp=(8, 6, 4, 2))
-        expected = (fnirt + ' --in=src',
-                    ('--ref=ref',
-                     '--iout=iout',
-                     '--fout=fout',
-                     '--subsamp=8,6,4,2'))
-        assert checkResult(result.stdout[0], *expected)
-
-
-def test_applywarp():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('applywarp',)) as fsldir:
-        applywarp = op.join(fsldir, 'bin', 'applywarp')
-        result    = fw.applywarp('src', 'ref', 'out', warp='warp', abs=True, super=True)
-        expected  = (applywarp + ' --in=src --ref=ref --out=out',
-                     ('--warp=warp', '--abs', '--super'))
-        assert checkResult(result.stdout[0], *expected)
-
-
-def test_invwarp():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('invwarp',)) as fsldir:
-        invwarp  = op.join(fsldir, 'bin', 'invwarp')
-        result   = fw.invwarp('warp', 'ref', 'out',
-                              rel=True, noconstraint=True)
-        expected = (invwarp + ' --warp=warp --ref=ref --out=out',
-                     ('--rel', '--noconstraint'))
-        assert checkResult(result.stdout[0], *expected)
-
-
-def test_convertwarp():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('convertwarp',)) as fsldir:
-        cnvwarp  = op.join(fsldir, 'bin', 'convertwarp')
-        result   = fw.convertwarp('out', 'ref', absout=True, jacobian='jacobian')
-        expected = (cnvwarp + ' --ref=ref --out=out',
-                     ('--absout', '--jacobian=jacobian'))
-        assert checkResult(result.stdout[0], *expected)
-
-
-def test_fugue():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('fugue',)) as fsldir:
-        fugue    = op.join(fsldir, 'bin', 'fugue')
-        result   = fw.fugue(input='input', warp='warp',
-                            median=True, dwell=10)
-        expected = (fugue, ('--in=input',
-                            '--warp=warp',
-                            '--median',
-                            '--dwell=10'))
-        assert checkResult(result.stdout[0], *expected)
-
-
-
-def test_sigloss():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('sigloss',)) as fsldir:
-        sigloss  = op.join(fsldir, 'bin', 'sigloss')
-        result   = fw.sigloss('input', 'sigloss', mask='mask', te=0.5)
-        expected = (sigloss + ' --in input --sigloss sigloss',
-                    ('--mask mask', '--te 0.5'))
-        assert checkResult(result.stdout[0], *expected)
-
-
-def test_prelude():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('prelude',)) as fsldir:
-        prelude  = op.join(fsldir, 'bin', 'prelude')
-        result   = fw.prelude(complex='complex',
-                              out='out',
-                              labelslices=True,
-                              start=5)
-        expected = (prelude, ('--complex=complex',
-                              '--out=out',
-                              '--labelslices',
-                              '--start=5'))
-        assert checkResult(result.stdout[0], *expected)
-
-
-def test_melodic():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('melodic',)) as fsldir:
-        melodic  = op.join(fsldir, 'bin', 'melodic')
-        result   = fw.melodic('input', dim=50, mask='mask', Oall=True)
-        expected = (melodic + ' --in=input',
-                    ('--dim=50', '--mask=mask', '--Oall'))
-        assert checkResult(result.stdout[0], *expected)
-
-
-def test_fsl_regfilt():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('fsl_regfilt',)) as fsldir:
-        regfilt  = op.join(fsldir, 'bin', 'fsl_regfilt')
-        result   = fw.fsl_regfilt('input', 'output', 'design',
-                                  filter=(1, 2, 3, 4), vn=True)
-        expected = (regfilt + ' --in=input --out=output --design=design',
-                    ('--filter=1,2,3,4', '--vn'))
-        assert checkResult(result.stdout[0], *expected)
-
-
-
-def test_fslreorient2std():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('fslreorient2std',)) as fsldir:
-        r2std    = op.join(fsldir, 'bin', 'fslreorient2std')
-        result   = fw.fslreorient2std('input', 'output')
-        expected = r2std + ' input output'
-        assert result.stdout[0] == expected
+def test_bet(fsldir):
+    with asrt.disabled(), run.dryrun():
+        bet      = op.join(fsldir, 'bin', 'bet')
+        result   = fw.bet('input', 'output', mask=True, c=(10, 20, 30))
+        expected = (bet + ' input output', ('-m', '-c 10 20 30'))
+        assert checkResult(result.stdout[0], *expected, stripdir=[2])
 
 
 def test_fslroi():
@@ -265,24 +213,6 @@ def test_fslroi():
         assert result.stdout[0] == expected
 
 
-def test_slicer():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('slicer',)) as fsldir:
-        slicer   = op.join(fsldir, 'bin', 'slicer')
-        result   = fw.slicer('input1', 'input2', i=(20, 100), x=(20, 'x.png'))
-        expected = slicer + ' input1 input2 -i 20 100 -x 20 x.png'
-        assert result.stdout[0] == expected
-
-
-def test_cluster():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('cluster',)) as fsldir:
-        cluster  = op.join(fsldir, 'bin', 'cluster')
-        result   = fw.cluster('input', 'thresh',
-                              fractional=True, osize='osize')
-        expected = (cluster + ' --in=input --thresh=thresh',
-                    ('--fractional', '--osize=osize'))
-        assert checkResult(result.stdout[0], *expected)
-
-
 def test_fslmaths():
     with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('fslmaths',)) as fsldir:
         cmd    = op.join(fsldir, 'bin', 'fslmaths')
@@ -351,15 +281,6 @@ def test_fsl_anat():
         assert result.stdout[0] == ' '.join(expected)
 
 
-def test_gps():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('gps',)) as fsldir:
-        gps = op.join(fsldir, 'bin', 'gps')
-        result = fw.gps('bvecs', 128, optws=True, ranseed=123)
-        expected = (gps + ' --ndir=128 --out=bvecs',
-                    ('--optws', '--ranseed=123'))
-        assert checkResult(result.stdout[0], *expected)
-
-
 def test_tbss():
     exes = {
         'preproc'  : 'tbss_1_preproc',
@@ -386,14 +307,3 @@ def test_tbss():
         assert fw.tbss.non_FA('alt')[0]     == ' '.join([exes['non_FA'], 'alt'])
         assert fw.tbss.fill('stat', 0.4, 'mean_fa', 'output', n=True).stdout[0] == \
             ' '.join([exes['fill'], 'stat', '0.4', 'mean_fa', 'output', '-n'])
-
-def test_fsl_prepare_fieldmap():
-    with asrt.disabled(), run.dryrun(), mockFSLDIR(bin=('fsl_prepare_fieldmap',)) as fsldir:
-        fpf = op.join(fsldir, 'bin', 'fsl_prepare_fieldmap')
-        result   = fw.fsl_prepare_fieldmap(phase_image='ph', 
-                                                 magnitude_image='mag', 
-                                                 out_image='out', 
-                                                 deltaTE=2.46, 
-                                                 nocheck=True)
-        expected = (fpf, ('SIEMENS', 'ph', 'mag', 'out', '2.46', '--nocheck'))
-        assert checkResult(result.stdout[0], *expected)
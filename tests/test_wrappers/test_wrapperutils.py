@@ -8,6 +8,7 @@
 import os.path as op
 import            os
 import            shlex
+import            itertools
 import            pathlib
 import            textwrap
 
@@ -32,12 +33,88 @@ from .. import mockFSLDIR, cleardir, checkdir, testdir, touch
 from ..test_run import mock_submit
 
 
-def test_applyArgStyle():
+# Input data shared by the fileOrArray/fileOrImage
+# tests - the expected output is ARR1 * ARR2
+ARR1     = np.array([[1,  2], [ 3,  4]])
+ARR2     = np.array([[5,  6], [ 7,  8]])
+ARR3     = np.array([[5,  6,    7,  8]])
+EXPECTED = np.array([[5, 12], [21, 32]])
+
+
+# Identity affine used for all test images.
+# Read-only, as it is shared across tests.
+EYE4 = np.eye(4)
+EYE4.setflags(write=False)
+
+
+# Header template for the fileOrImage test
+# images, which all contain int64 data.
+IMGHDR = nib.nifti1.Nifti1Header()
+IMGHDR.set_data_dtype(np.int64)
+
+
+def _makeimg(data):
+    """Creates a ``Nifti1Image`` from the given int64 data, using a copy of
+    the shared header template.
+    """
+    return nib.nifti1.Nifti1Image(data, EYE4, header=IMGHDR.copy())
+
+
+@pytest.fixture(scope='module')
+def inputdir(tmp_path_factory):
+    """Creates a directory containing input files for the fileOrArray/
+    fileOrImage tests, once for the whole module. Tests must not modify
+    the contents of this directory.
+    """
+    inputdir = str(tmp_path_factory.mktemp('wrapperutils_inputs'))
+    np.savetxt(op.join(inputdir, 'arr1.txt'),  ARR1)
+    np.savetxt(op.join(inputdir, 'arr2.txt'),  ARR2)
+    np.savetxt(op.join(inputdir, 'arr3.txt'),  ARR3)
+    nib.save(_makeimg(ARR1), op.join(inputdir, 'img1.nii'))
+    nib.save(_makeimg(ARR2), op.join(inputdir, 'img2.nii'))
+    return inputdir
+
+
+def _toks(s):
+    """Tokenises an expected command-line string. ``shlex`` is only needed
+    for strings which contain quotes.
+    """
+    if '"' in s or "'" in s: return shlex.split(s)
+    else:                    return s.split()
+
+
+APPLYARGSTYLE_KWARGS = {
+    'name'  : 'val',
+    'name2' : ['val1', 'val2'],
+}
 
-    kwargs = {
-        'name'  : 'val',
-        'name2' : ['val1', 'val2'],
-    }
+
+# style, valsep, expected_result.
+# Order of arguments is not guaranteed.
+# The expected results are tokenised
+# once, when the module is imported.
+APPLYARGSTYLE_TESTS = [
+    ('-',   ' ', [' -name  val', '-name2   val1 val2']),
+    ('-',   '"', [' -name  val', '-name2  "val1 val2"']),
+    ('-',   ',', [' -name  val', '-name2   val1,val2']),
+
+    ('--',  ' ', ['--name  val', '--name2  val1 val2']),
+    ('--',  '"', ['--name  val', '--name2 "val1 val2"']),
+    ('--',  ',', ['--name  val', '--name2  val1,val2']),
+
+    ('-=',  '"', [' -name=val', '-name2="val1 val2"']),
+    ('-=',  ',', [' -name=val', '-name2=val1,val2']),
+
+    ('--=', '"', ['--name=val', '--name2="val1 val2"']),
+    ('--=', ',', ['--name=val', '--name2=val1,val2']),
+]
+APPLYARGSTYLE_TESTS = [(style, valsep, [_toks(e) for e in exp])
+                       for style, valsep, exp in APPLYARGSTYLE_TESTS]
+
+
+def test_applyArgStyle_invalid():
+
+    kwargs = APPLYARGSTYLE_KWARGS
 
     # these combinations of style+valsep should
     # raise an error
@@ -52,29 +129,14 @@ def test_applyArgStyle():
     with pytest.raises(ValueError):
         wutils.applyArgStyle('-', valsep='b', **kwargs)
 
-    # style, valsep, expected_result.
-    # Order of arguments is not guaranteed
-    tests = [
-        ('-',   ' ', [' -name  val', '-name2   val1 val2']),
-        ('-',   '"', [' -name  val', '-name2  "val1 val2"']),
-        ('-',   ',', [' -name  val', '-name2   val1,val2']),
 
-        ('--',  ' ', ['--name  val', '--name2  val1 val2']),
-        ('--',  '"', ['--name  val', '--name2 "val1 val2"']),
-        ('--',  ',', ['--name  val', '--name2  val1,val2']),
+@pytest.mark.parametrize('style,valsep,exp', APPLYARGSTYLE_TESTS)
+def test_applyArgStyle(style, valsep, exp):
+    result = wutils.applyArgStyle(style,
+                                  valsep=valsep,
+                                  **APPLYARGSTYLE_KWARGS)
 
-        ('-=',  '"', [' -name=val', '-name2="val1 val2"']),
-        ('-=',  ',', [' -name=val', '-name2=val1,val2']),
-
-        ('--=', '"', ['--name=val', '--name2="val1 val2"']),
-        ('--=', ',', ['--name=val', '--name2=val1,val2']),
-    ]
-
-    for style, valsep, exp in tests:
-        exp    = [shlex.split(e) for e in exp]
-        result = wutils.applyArgStyle(style, valsep=valsep, **kwargs)
-
-        assert result in (exp[0] + exp[1], exp[1] + exp[0])
+    assert result in (exp[0] + exp[1], exp[1] + exp[0])
 
 
 def test_applyArgStyle_argmap():
@@ -96,34 +158,57 @@ def test_applyArgStyle_argmap():
     assert wutils.applyArgStyle('-', argmap=argmap, **kwargs) in exp
 
 
-def test_applyArgStyle_valmap():
+# kwargs, expected
+APPLYARGSTYLE_VALMAP_TESTS = [
+    ({                          }, ['']),
+    ({ 'a' : False,             }, ['']),
+    ({ 'a' : True,              }, ['-a']),
+    ({              'b' : False }, ['-b']),
+    ({              'b' : True  }, ['']),
+    ({ 'a' : False, 'b' : True  }, ['']),
+    ({ 'a' : True,  'b' : True  }, ['-a']),
+    ({ 'a' : False, 'b' : False }, ['-b']),
+    ({ 'a' : False, 'b' : True  }, ['']),
+    ({ 'a' : True,  'b' : False }, ['-a -b', '-b -a']),
+    ({ 'a' : True,  'b' : True  }, ['-a']),
+]
+APPLYARGSTYLE_VALMAP_TESTS = [
+    (kwargs, [_toks(e) for e in expected])
+    for kwargs, expected in APPLYARGSTYLE_VALMAP_TESTS]
+
+
+@pytest.mark.parametrize('kwargs,expected', APPLYARGSTYLE_VALMAP_TESTS)
+def test_applyArgStyle_valmap(kwargs, expected):
 
     valmap = {
         'a' : wutils.SHOW_IF_TRUE,
         'b' : wutils.HIDE_IF_TRUE,
     }
 
-    # kwargs, expected
-    tests = [
-        ({                          }, ['']),
-        ({ 'a' : False,             }, ['']),
-        ({ 'a' : True,              }, ['-a']),
-        ({              'b' : False }, ['-b']),
-        ({              'b' : True  }, ['']),
-        ({ 'a' : False, 'b' : True  }, ['']),
-        ({ 'a' : True,  'b' : True  }, ['-a']),
-        ({ 'a' : False, 'b' : False }, ['-b']),
-        ({ 'a' : False, 'b' : True  }, ['']),
-        ({ 'a' : True,  'b' : False }, ['-a -b', '-b -a']),
-        ({ 'a' : True,  'b' : True  }, ['-a']),
-    ]
+    assert wutils.applyArgStyle('-', valmap=valmap, **kwargs) in expected
 
-    for kwargs, expected in tests:
-        expected = [shlex.split(e) for e in expected]
-        assert wutils.applyArgStyle('-', valmap=valmap, **kwargs) in expected
 
+# kwargs, expected
+APPLYARGSTYLE_ARGMAP_VALMAP_TESTS = [
+    ({                            }, ['']),
+    ({ 'a1' : False,              }, ['']),
+    ({ 'a1' : True,               }, ['-a']),
+    ({               'a2' : False }, ['-b']),
+    ({               'a2' : True  }, ['']),
+    ({ 'a1' : False, 'a2' : True  }, ['']),
+    ({ 'a1' : True,  'a2' : True  }, ['-a']),
+    ({ 'a1' : False, 'a2' : False }, ['-b']),
+    ({ 'a1' : False, 'a2' : True  }, ['']),
+    ({ 'a1' : True,  'a2' : False }, ['-a -b', '-b -a']),
+    ({ 'a1' : True,  'a2' : True  }, ['-a']),
+]
+APPLYARGSTYLE_ARGMAP_VALMAP_TESTS = [
+    (kwargs, [_toks(e) for e in expected])
+    for kwargs, expected in APPLYARGSTYLE_ARGMAP_VALMAP_TESTS]
 
-def test_applyArgStyle_argmap_valmap():
+
+@pytest.mark.parametrize('kwargs,expected', APPLYARGSTYLE_ARGMAP_VALMAP_TESTS)
+def test_applyArgStyle_argmap_valmap(kwargs, expected):
 
     argmap = {'a1' : 'a', 'a2' : 'b'}
     valmap = {
@@ -131,185 +216,157 @@ def test_applyArgStyle_argmap_valmap():
         'b' : wutils.HIDE_IF_TRUE,
     }
 
-    # kwargs, expected
-    tests = [
-        ({                            }, ['']),
-        ({ 'a1' : False,              }, ['']),
-        ({ 'a1' : True,               }, ['-a']),
-        ({               'a2' : False }, ['-b']),
-        ({               'a2' : True  }, ['']),
-        ({ 'a1' : False, 'a2' : True  }, ['']),
-        ({ 'a1' : True,  'a2' : True  }, ['-a']),
-        ({ 'a1' : False, 'a2' : False }, ['-b']),
-        ({ 'a1' : False, 'a2' : True  }, ['']),
-        ({ 'a1' : True,  'a2' : False }, ['-a -b', '-b -a']),
-        ({ 'a1' : True,  'a2' : True  }, ['-a']),
-    ]
-
-    for kwargs, expected in tests:
-        expected = [shlex.split(e) for e in expected]
-        assert wutils.applyArgStyle(
-            '-', argmap=argmap, valmap=valmap, **kwargs) in expected
-
-
-def test_namedPositionals():
-    def func1(): pass
-    def func2(a, b, c): pass
-    def func3(a, b, c, d=None, e=None): pass
-    def func4(*args): pass
-    def func5(*args, **kwargs): pass
-    def func6(a, b, *args): pass
-    def func7(a, b, *args, **kwargs): pass
-
-    tests = [
-        (func1, [],        []),
-        (func2, [1, 2, 3], ['a', 'b', 'c']),
-        (func3, [1, 2, 3], ['a', 'b', 'c']),
-        (func4, [1, 2, 3], ['args0', 'args1', 'args2']),
-        (func5, [1, 2, 3], ['args0', 'args1', 'args2']),
-        (func6, [1, 2, 3], ['a', 'b', 'args0']),
-        (func7, [1, 2, 3], ['a', 'b', 'args0']),
-    ]
-
-    for func, args, expected in tests:
-        result = wutils.namedPositionals(func, args)
-        assert list(result) == list(expected)
-
-
-def test_fileOrArray():
-
-    @wutils.fileOrArray('arr1', 'other', 'output')
-    def func(arr1, **kwargs):
-        arr1  = np.loadtxt(arr1)
-        other = np.loadtxt(kwargs['other'])
-        np.savetxt(kwargs['output'], (arr1 * other))
+    assert wutils.applyArgStyle(
+        '-', argmap=argmap, valmap=valmap, **kwargs) in expected
 
-    with tempdir.tempdir():
 
-        arr1     = np.array([[1,  2], [ 3,  4]])
-        other    = np.array([[5,  6], [ 7,  8]])
-        expected = np.array([[5, 12], [21, 32]])
-        np.savetxt('arr1.txt',  arr1)
-        np.savetxt('other.txt', other)
+def _makefunc(sig):
+    """Creates a no-op function with the given signature. The functions are
+    only used to test namedPositionals, so only their signature matters.
+    """
+    return eval(f'lambda {sig}: None')
 
-        # file  file  file
-        func('arr1.txt', other='other.txt', output='output.txt')
-        assert np.all(np.loadtxt('output.txt') == expected)
-        os.remove('output.txt')
 
-        # file  file  array
-        result = func('arr1.txt', other='other.txt', output=wutils.LOAD)['output']
-        assert np.all(result == expected)
+# func, args, expected
+NAMEDPOSITIONALS_TESTS = [
+    (_makefunc(''),                    [],        ()),
+    (_makefunc('a, b, c'),             [1, 2, 3], ('a', 'b', 'c')),
+    (_makefunc('a, b, c, d=None, e=None'),
+                                       [1, 2, 3], ('a', 'b', 'c')),
+    (_makefunc('*args'),               [1, 2, 3], ('args0', 'args1', 'args2')),
+    (_makefunc('*args, **kwargs'),     [1, 2, 3], ('args0', 'args1', 'args2')),
+    (_makefunc('a, b, *args'),         [1, 2, 3], ('a', 'b', 'args0')),
+    (_makefunc('a, b, *args, **kwargs'),
+                                       [1, 2, 3], ('a', 'b', 'args0')),
+]
 
-        # file  array file
-        func('arr1.txt', other=other, output='output.txt')
-        assert np.all(np.loadtxt('output.txt') == expected)
-        os.remove('output.txt')
 
-        # file  array array
-        result = func('arr1.txt', other=other, output=wutils.LOAD)['output']
-        assert np.all(result == expected)
+@pytest.mark.parametrize('func,args,expected', NAMEDPOSITIONALS_TESTS)
+def test_namedPositionals(func, args, expected):
+    assert tuple(wutils.namedPositionals(func, args)) == expected
 
-        # array file  file
-        func(arr1, other='other.txt', output='output.txt')
-        assert np.all(np.loadtxt('output.txt') == expected)
-        os.remove('output.txt')
 
-        # array file  array
-        result = func(arr1, other='other.txt', output=wutils.LOAD)['output']
-        assert np.all(result == expected)
+def test_namedPositionals_returns_copy():
+    func   = _makefunc('a, b, *args')
+    result = wutils.namedPositionals(func, [1, 2, 3])
+    result.append('c')
+    result[0] = 'z'
+    assert wutils.namedPositionals(func, [1, 2, 3]) == ['a', 'b', 'args0']
 
-        # array array file
-        func(arr1, other=other, output='output.txt')
-        assert np.all(np.loadtxt('output.txt') == expected)
-        os.remove('output.txt')
 
-        # array array array
-        result = func(arr1, other=other, output=wutils.LOAD)['output']
-        assert np.all(result == expected)
+def test_namedPositionals_unhashable():
 
+    class Unhashable(object):
+        __hash__ = None
+        def __call__(self, a, b, *args):
+            pass
 
-def test_fileOrImage():
+    # getfullargspec includes "self"
+    # for callable instances
+    func = Unhashable()
+    assert wutils.namedPositionals(func, [1, 2, 3]) == ['self', 'a', 'b']
 
-    @wutils.fileOrImage('img1', 'img2', 'output')
-    def func(img1, **kwargs):
-        img1   = np.asanyarray(nib.load(img1).dataobj)
-        img2   = np.asanyarray(nib.load(kwargs['img2']).dataobj)
-        output = nib.nifti1.Nifti1Image(img1 * img2, np.eye(4))
-        nib.save(output, kwargs['output'])
 
-    with tempdir.tempdir():
+# Input/output modes for the fileOrArray/fileOrImage
+# tests - every combination of file/in-memory for the
+# two inputs and the output is tested.
+FILEORTHING_MODES = list(itertools.product(['file', 'array'], repeat=3))
 
-        img1     = nib.nifti1.Nifti1Image(np.array([[1,  2], [ 3,  4]]), np.eye(4))
-        img2     = nib.nifti1.Nifti1Image(np.array([[5,  6], [ 7,  8]]), np.eye(4))
-        img3     = nib.nifti1.Nifti1Image(np.array([[1,  2], [ 3,  4]]), np.eye(4))
-        expected = np.array([[5, 12], [21, 32]])
-        nib.save(img1, 'img1.nii')
-        nib.save(img2, 'img2.nii')
-
-        # file  file  file
-        func('img1.nii', img2='img2.nii', output='output.nii')
-        assert np.all(np.asanyarray(nib.load('output.nii').dataobj) == expected)
-        os.remove('output.nii')
-
-        # file  file  array
-        result = func('img1.nii', img2='img2.nii', output=wutils.LOAD)['output']
-        assert np.all(np.asanyarray(result.dataobj) == expected)
-
-        # file  array file
-        func('img1.nii', img2=img2, output='output.nii')
-        assert np.all(np.asanyarray(nib.load('output.nii').dataobj) == expected)
-        os.remove('output.nii')
-
-        # file  array array
-        result = func('img1.nii', img2=img2, output=wutils.LOAD)['output']
-        assert np.all(np.asanyarray(result.dataobj) == expected)
-
-        # array file  file
-        func(img1, img2='img2.nii', output='output.nii')
-        assert np.all(np.asanyarray(nib.load('output.nii').dataobj) == expected)
-        os.remove('output.nii')
-
-        # array file  array
-        result = func(img1, img2='img2.nii', output=wutils.LOAD)['output']
-        assert np.all(np.asanyarray(result.dataobj) == expected)
-
-        # array array file
-        func(img1, img2=img2, output='output.nii')
-        assert np.all(np.asanyarray(nib.load('output.nii').dataobj) == expected)
-        os.remove('output.nii')
-
-        # array array array
-        result = func(img1, img2=img2, output=wutils.LOAD)['output']
-        assert np.all(np.asanyarray(result.dataobj) == expected)
-
-        # in-memory image, file, file
-        result = func(img3, img2='img2.nii', output='output.nii')
-        assert np.all(np.asanyarray(nib.load('output.nii').dataobj) == expected)
-        os.remove('output.nii')
-
-        # fslimage, file, load
-        result = func(fslimage.Image(img1), img2='img2.nii',
-                      output=wutils.LOAD)['output']
-        assert isinstance(result, fslimage.Image)
-        assert np.all(result[:].squeeze() == expected)
-
-        # fslimage, fslimage, load
-        result = func(fslimage.Image(img1), img2=fslimage.Image(img2),
-                      output=wutils.LOAD)['output']
-        assert isinstance(result, fslimage.Image)
-        assert np.all(result[:].squeeze() == expected)
-
-        # fslimage, nib.image, load
-        result = func(fslimage.Image(img1), img2=img2,
-                      output=wutils.LOAD)['output']
-        assert isinstance(result, fslimage.Image)
-        assert np.all(result[:].squeeze() == expected)
-
-        # nib.image, nib.image, load
-        result = func(img1, img2=img2, output=wutils.LOAD)['output']
-        assert isinstance(result, nib.nifti1.Nifti1Image)
-        assert np.all(np.asanyarray(result.dataobj)[:] == expected)
+
+@wutils.fileOrArray('arr1', 'other', 'output')
+def _fileOrArrayFunc(arr1, **kwargs):
+    arr1  = np.loadtxt(arr1)
+    other = np.loadtxt(kwargs['other'])
+    np.savetxt(kwargs['output'], (arr1 * other))
+
+
+@wutils.fileOrImage('img1', 'img2', 'output')
+def _fileOrImageFunc(img1, **kwargs):
+    img1   = np.asanyarray(nib.load(img1).dataobj)
+    img2   = np.asanyarray(nib.load(kwargs['img2']).dataobj)
+    output = _makeimg(img1 * img2)
+    nib.save(output, kwargs['output'])
+
+
+@pytest.mark.parametrize('arr1mode,othermode,outmode', FILEORTHING_MODES)
+def test_fileOrArray(inputdir, fasttmp, monkeypatch,
+                     arr1mode, othermode, outmode):
+
+    if arr1mode  == 'file': arr1  = op.join(inputdir, 'arr1.txt')
+    else:                   arr1  = ARR1
+    if othermode == 'file': other = op.join(inputdir, 'arr2.txt')
+    else:                   other = ARR2
+
+    monkeypatch.chdir(fasttmp)
+
+    if outmode == 'file':
+        _fileOrArrayFunc(arr1, other=other, output='output.txt')
+        result = np.loadtxt('output.txt')
+    else:
+        result = _fileOrArrayFunc(arr1, other=other,
+                                  output=wutils.LOAD)['output']
+
+    assert np.array_equal(result, EXPECTED)
+
+
+@pytest.mark.parametrize('img1mode,img2mode,outmode', FILEORTHING_MODES)
+def test_fileOrImage(inputdir, fasttmp, monkeypatch,
+                     img1mode, img2mode, outmode):
+
+    if img1mode == 'file': img1 = op.join(inputdir, 'img1.nii')
+    else:                  img1 = _makeimg(ARR1)
+    if img2mode == 'file': img2 = op.join(inputdir, 'img2.nii')
+    else:                  img2 = _makeimg(ARR2)
+
+    monkeypatch.chdir(fasttmp)
+
+    if outmode == 'file':
+        _fileOrImageFunc(img1, img2=img2, output='output.nii')
+        result = nib.load('output.nii')
+    else:
+        result = _fileOrImageFunc(img1, img2=img2,
+                                  output=wutils.LOAD)['output']
+
+    assert np.array_equal(np.asanyarray(result.dataobj), EXPECTED)
+
+
+def test_fileOrImage_inmemory(inputdir, fasttmp, monkeypatch):
+
+    func     = _fileOrImageFunc
+    img1     = _makeimg(ARR1)
+    img2     = _makeimg(ARR2)
+    img3     = _makeimg(ARR1)
+    expected = EXPECTED
+    img2file = op.join(inputdir, 'img2.nii')
+
+    monkeypatch.chdir(fasttmp)
+
+    # in-memory image, file, file
+    result = func(img3, img2=img2file, output='out_mff.nii')
+    assert np.array_equal(np.asanyarray(nib.load('out_mff.nii').dataobj), expected)
+
+    # fslimage, file, load
+    result = func(fslimage.Image(img1), img2=img2file,
+                  output=wutils.LOAD)['output']
+    assert isinstance(result, fslimage.Image)
+    assert np.array_equal(result[:].squeeze(), expected)
+
+    # fslimage, fslimage, load
+    result = func(fslimage.Image(img1), img2=fslimage.Image(img2),
+                  output=wutils.LOAD)['output']
+    assert isinstance(result, fslimage.Image)
+    assert np.array_equal(result[:].squeeze(), expected)
+
+    # fslimage, nib.image, load
+    result = func(fslimage.Image(img1), img2=img2,
+                  output=wutils.LOAD)['output']
+    assert isinstance(result, fslimage.Image)
+    assert np.array_equal(result[:].squeeze(), expected)
+
+    # nib.image, nib.image, load
+    result = func(img1, img2=img2, output=wutils.LOAD)['output']
+    assert isinstance(result, nib.nifti1.Nifti1Image)
+    assert np.array_equal(np.asanyarray(result.dataobj)[:], expected)
 
 
 def test_fileOrThing_sequence():
@@ -385,15 +442,15 @@ def test_fileOrThing_outprefix():
     def basefunc(img, output_base):
         img = np.asanyarray(nib.load(img).dataobj)
 
-        out1 = nib.nifti1.Nifti1Image(img * 5,  np.eye(4))
-        out2 = nib.nifti1.Nifti1Image(img * 10, np.eye(4))
+        out1 = nib.nifti1.Nifti1Image(img * 5,  EYE4)
+        out2 = nib.nifti1.Nifti1Image(img * 10, EYE4)
 
         nib.save(out1, '{}_times5.nii.gz' .format(output_base))
         nib.save(out2, '{}_times10.nii.gz'.format(output_base))
 
 
     with tempdir.tempdir() as td:
-        img  = nib.nifti1.Nifti1Image(np.array([[1, 2], [3, 4]]), np.eye(4))
+        img  = nib.nifti1.Nifti1Image(np.array([[1, 2], [3, 4]]), EYE4)
         exp1 = np.asanyarray(img.dataobj) * 5
         exp2 = np.asanyarray(img.dataobj) * 10
         nib.save(img, 'img.nii')
@@ -428,7 +485,7 @@ def test_fileOrThing_outprefix_differentTypes():
     def func(img, outpref):
 
         img  = nib.load(img)
-        img  = nib.nifti1.Nifti1Image(np.asanyarray(img.dataobj) * 2, np.eye(4))
+        img  = nib.nifti1.Nifti1Image(np.asanyarray(img.dataobj) * 2, EYE4)
         text = '1234567890'
 
         nib.save(img, '{}_image.nii.gz' .format(outpref))
@@ -437,7 +494,7 @@ def test_fileOrThing_outprefix_differentTypes():
             f.write(text)
 
     with tempdir.tempdir() as td:
-        img  = nib.nifti1.Nifti1Image(np.array([[1, 2], [3, 4]]), np.eye(4))
+        img  = nib.nifti1.Nifti1Image(np.array([[1, 2], [3, 4]]), EYE4)
         expi = np.asanyarray(img.dataobj) * 2
         expt = '1234567890'
 
@@ -471,8 +528,8 @@ def test_fileOrThing_outprefix_directory():
     @wutils.fileOrImage('img', outprefix='outpref')
     def func(img, outpref):
         img  = nib.load(img)
-        img2 = nib.nifti1.Nifti1Image(np.asanyarray(img.dataobj) * 2, np.eye(4))
-        img4 = nib.nifti1.Nifti1Image(np.asanyarray(img.dataobj) * 4, np.eye(4))
+        img2 = nib.nifti1.Nifti1Image(np.asanyarray(img.dataobj) * 2, EYE4)
+        img4 = nib.nifti1.Nifti1Image(np.asanyarray(img.dataobj) * 4, EYE4)
 
         outdir = op.abspath('{}_imgs'.format(outpref))
 
@@ -482,7 +539,7 @@ def test_fileOrThing_outprefix_directory():
         nib.save(img4, op.join(outdir, 'img4.nii.gz'))
 
     with tempdir.tempdir() as td:
-        img  = nib.nifti1.Nifti1Image(np.array([[1, 2], [3, 4]]), np.eye(4))
+        img  = nib.nifti1.Nifti1Image(np.array([[1, 2], [3, 4]]), EYE4)
         exp2 = np.asanyarray(img.dataobj) * 2
         exp4 = np.asanyarray(img.dataobj) * 4
 
@@ -627,56 +684,55 @@ def test_FileOrThing_invalid_identifiers():
 
 
 
-def test_chained_fileOrImageAndArray():
+def test_chained_fileOrImageAndArray(inputdir, fasttmp, monkeypatch):
     @wutils.fileOrImage('image', 'outimage')
     @wutils.fileOrArray('array', 'outarray')
     def func(image, array, outimage, outarray):
         image = nib.load(image)
         array = np.loadtxt(array)
 
-        outimg = nib.nifti1.Nifti1Image(np.asanyarray(image.dataobj) * 2, np.eye(4))
+        outimg = nib.nifti1.Nifti1Image(np.asanyarray(image.dataobj) * 2, EYE4)
 
         np.savetxt(outarray, array * 2)
         outimg.to_filename(outimage)
 
-    image = nib.nifti1.Nifti1Image(np.array([[1,  2], [ 3,  4]]), np.eye(4))
-    array = np.array([[5, 6, 7, 8]])
+    image     = nib.nifti1.Nifti1Image(ARR1, EYE4)
+    array     = ARR3
+    imagefile = op.join(inputdir, 'img1.nii')
+    arrayfile = op.join(inputdir, 'arr3.txt')
 
-    expimg = nib.nifti1.Nifti1Image(np.asanyarray(image.dataobj) * 2, np.eye(4))
+    expimg = nib.nifti1.Nifti1Image(np.asanyarray(image.dataobj) * 2, EYE4)
     exparr = array * 2
 
-    with tempdir.tempdir():
-
-        nib.save(image, 'image.nii')
-        np.savetxt('array.txt', array)
+    monkeypatch.chdir(fasttmp)
 
-        func('image.nii', 'array.txt', 'outimg.nii', 'outarr.txt')
-        assert np.all(np.asanyarray(nib.load('outimg.nii').dataobj) == np.asanyarray(expimg.dataobj))
-        assert np.all(np.loadtxt('outarr.txt') == exparr)
+    func(imagefile, arrayfile, 'outimg.nii', 'outarr.txt')
+    assert np.all(np.asanyarray(nib.load('outimg.nii').dataobj) == np.asanyarray(expimg.dataobj))
+    assert np.all(np.loadtxt('outarr.txt') == exparr)
 
-        func('image.nii', array, 'outimg.nii', 'outarr.txt')
-        assert np.all(np.asanyarray(nib.load('outimg.nii').dataobj) == np.asanyarray(expimg.dataobj))
-        assert np.all(np.loadtxt('outarr.txt') == exparr)
+    func(imagefile, array, 'outimg.nii', 'outarr.txt')
+    assert np.all(np.asanyarray(nib.load('outimg.nii').dataobj) == np.asanyarray(expimg.dataobj))
+    assert np.all(np.loadtxt('outarr.txt') == exparr)
 
-        func( image, 'array.txt', 'outimg.nii', 'outarr.txt')
-        assert np.all(np.asanyarray(nib.load('outimg.nii').dataobj) == np.asanyarray(expimg.dataobj))
-        assert np.all(np.loadtxt('outarr.txt') == exparr)
+    func( image, arrayfile, 'outimg.nii', 'outarr.txt')
+    assert np.all(np.asanyarray(nib.load('outimg.nii').dataobj) == np.asanyarray(expimg.dataobj))
+    assert np.all(np.loadtxt('outarr.txt') == exparr)
 
-        func( image, array, 'outimg.nii', 'outarr.txt')
-        assert np.all(np.asanyarray(nib.load('outimg.nii').dataobj) == np.asanyarray(expimg.dataobj))
-        assert np.all(np.loadtxt('outarr.txt') == exparr)
+    func( image, array, 'outimg.nii', 'outarr.txt')
+    assert np.all(np.asanyarray(nib.load('outimg.nii').dataobj) == np.asanyarray(expimg.dataobj))
+    assert np.all(np.loadtxt('outarr.txt') == exparr)
 
-        res = func(image, array, wutils.LOAD, 'outarr.txt')
-        assert np.all(np.asanyarray(res['outimage'].dataobj) == np.asanyarray(expimg.dataobj))
-        assert np.all(np.loadtxt('outarr.txt') == exparr)
+    res = func(image, array, wutils.LOAD, 'outarr.txt')
+    assert np.all(np.asanyarray(res['outimage'].dataobj) == np.asanyarray(expimg.dataobj))
+    assert np.all(np.loadtxt('outarr.txt') == exparr)
 
-        res = func(image, array, 'outimg.nii', wutils.LOAD)
-        assert np.all(np.asanyarray(nib.load('outimg.nii').dataobj) == np.asanyarray(expimg.dataobj))
-        assert np.all(res['outarray'] == exparr)
+    res = func(image, array, 'outimg.nii', wutils.LOAD)
+    assert np.all(np.asanyarray(nib.load('outimg.nii').dataobj) == np.asanyarray(expimg.dataobj))
+    assert np.all(res['outarray'] == exparr)
 
-        res = func(image, array, wutils.LOAD, wutils.LOAD)
-        assert np.all(np.asanyarray(res['outimage'].dataobj) == np.asanyarray(expimg.dataobj))
-        assert np.all(res['outarray'] == exparr)
+    res = func(image, array, wutils.LOAD, wutils.LOAD)
+    assert np.all(np.asanyarray(res['outimage'].dataobj) == np.asanyarray(expimg.dataobj))
+    assert np.all(res['outarray'] == exparr)
 
 
 def test_fileOrThing_chained_outprefix():
@@ -692,16 +748,16 @@ def test_fileOrThing_chained_outprefix():
         image = nib.load(image)
         array = np.loadtxt(array)
 
-        outimg = nib.nifti1.Nifti1Image(np.asanyarray(image.dataobj) * 2, np.eye(4))
+        outimg = nib.nifti1.Nifti1Image(np.asanyarray(image.dataobj) * 2, EYE4)
         outarr = array * 2
 
         np.savetxt('{}_array.txt'.format(out), outarr)
         outimg.to_filename('{}_image.nii'.format(out))
 
-    image = nib.nifti1.Nifti1Image(np.array([[1,  2], [ 3,  4]]), np.eye(4))
+    image = nib.nifti1.Nifti1Image(np.array([[1,  2], [ 3,  4]]), EYE4)
     array = np.array([[5, 6, 7, 8]])
 
-    expimg = nib.nifti1.Nifti1Image(np.asanyarray(image.dataobj) * 2, np.eye(4))
+    expimg = nib.nifti1.Nifti1Image(np.asanyarray(image.dataobj) * 2, EYE4)
     exparr = array * 2
 
     with tempdir.tempdir():
@@ -726,12 +782,12 @@ def test_fileOrThing_submit_cmdonly():
             return 'cmdonly!'
 
         img = nib.load(input)
-        img = nib.nifti1.Nifti1Image(np.asanyarray(img.dataobj) * 2, np.eye(4))
+        img = nib.nifti1.Nifti1Image(np.asanyarray(img.dataobj) * 2, EYE4)
 
         nib.save(img, output)
 
     with tempdir.tempdir() as td:
-        img = nib.nifti1.Nifti1Image(np.array([[1, 2], [3, 4]]), np.eye(4))
+        img = nib.nifti1.Nifti1Image(np.array([[1, 2], [3, 4]]), EYE4)
         exp = np.asanyarray(img.dataobj) * 2
         nib.save(img, 'input.nii.gz')
 